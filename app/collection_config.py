@@ -8,12 +8,14 @@ COLLECTION_CONFIGS = {
         "item_file_pattern": "cube-items.json",
         "s3_file_pattern": "*.ndjson",
         "filename_regex": r"^\d{4}$",  # 4-digit years
+        "yearly_files_only": True,  # one {year}.ndjson per folder, nothing else
         "description": "Cloud optimized Zarr cubes with datacube extensions"
     },
     "velocity-mosaics": {
         "item_file_pattern": "velocity-mosaics-items.json", 
         "s3_file_pattern": "*.ndjson",
         "filename_regex": r"^\d{4}$",  # 4-digit years
+        "yearly_files_only": True,  # one {year}.ndjson per folder, nothing else
         "description": "Regional glacier velocity mosaics (annual and static)"
     },
     "velocity-granules": {
@@ -23,12 +25,21 @@ COLLECTION_CONFIGS = {
     }
 }
 
+# Compile filename regexes once, the configuration is static
+for _config in COLLECTION_CONFIGS.values():
+    if _config.get("filename_regex"):
+        _config["_filename_regex_compiled"] = re.compile(_config["filename_regex"])
+
+# Reverse lookup from item filename to collection ID
+_FILENAME_TO_COLLECTION = {
+    config["item_file_pattern"]: collection_id
+    for collection_id, config in COLLECTION_CONFIGS.items()
+    if "item_file_pattern" in config
+}
+
 def get_collection_name_from_filename(filename: str) -> Optional[str]:
     """Get collection name from item filename using configuration."""
-    for collection_id, config in COLLECTION_CONFIGS.items():
-        if config.get("item_file_pattern") == filename:
-            return collection_id
-    return None
+    return _FILENAME_TO_COLLECTION.get(filename)
 
 def get_collection_config(collection_id: str) -> Optional[Dict]:
     """Get configuration for a specific collection."""
@@ -42,8 +53,12 @@ def get_file_pattern_for_collection(collection_id: str) -> Optional[str]:
 def get_filename_regex_for_collection(collection_id: str) -> Optional[re.Pattern]:
     """Get compiled filename regex for a collection."""
     config = get_collection_config(collection_id)
-    regex_str = config.get("filename_regex")
-    return re.compile(regex_str) if regex_str else None
+    return config.get("_filename_regex_compiled") if config else None
+
+def has_yearly_files_only(collection_id: str) -> bool:
+    """Check if a collection's folders hold nothing but {year}.ndjson files."""
+    config = get_collection_config(collection_id)
+    return bool(config and config.get("yearly_files_only"))
 
 def supports_s3_ingestion(collection_id: str) -> bool:
     """Check if collection supports S3-based ingestion."""
@@ -45,7 +45,7 @@ echo "=============================="
 # Check if Python is available
 if [ "$PYTHON_PATH" != "NOT FOUND" ]; then
     echo "Starting uvicorn with python -m approach..."
-    exec micromamba run -p /opt/conda python -m uvicorn main:app --host 0.0.0.0 --port 8000 --log-level info
+    exec micromamba run -p /opt/conda python -m uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --log-level info
 else
     echo "ERROR: Python not found in environment! Cannot start service."
     exit 1
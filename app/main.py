@@ -1,24 +1,45 @@
 import os
 import asyncio
+import atexit
+import hmac
+import re
 import time
+import uuid
+from collections import OrderedDict
+from typing import Literal
 from fastapi import (
     FastAPI,
     HTTPException,
     BackgroundTasks,
     Query,
     Depends,
-    Request,
     status,
 )
-from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyHeader
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from datetime import datetime
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 
 from fastapi.logger import logger as fastapi_logger
-
-from tasks import process_files, initialize_database_task, dummy_task, check_database_connection
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
+
+from tasks import (
+    process_files,
+    initialize_database_task,
+    dummy_task,
+    check_database_connection,
+    open_database_pool,
+    close_database_pool,
+    close_async_s3,
+    pgstac_loaders,
+    pgstac_workers,
+    PGSTAC_SUBPROCESS,
+)
 from tracker import active_processes, job_tracker as tracker
 
 # Setup logging
@@ -27,34 +48,60 @@ from tracker import active_processes, job_tracker as tracker
 # )
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 logger = logging.getLogger("uvicorn")
 logger.setLevel(logging.INFO)
 formatter = logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s')
 
-# Console Handler for stdout logging
+# Records are queued by the request path and written to stdout by a listener
+# thread. This replaces uvicorn's own handlers, so each line is emitted once.
+log_queue = queue.SimpleQueue()
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
-fastapi_logger.handlers = logger.handlers
+log_listener = QueueListener(log_queue, console_handler)
+log_listener.start()
+# Stopped at interpreter exit, after uvicorn's last shutdown lines are queued
+atexit.register(log_listener.stop)
+
+queue_handler = QueueHandler(log_queue)
+for logger_name in ("uvicorn", "uvicorn.access"):
+    logging.getLogger(logger_name).handlers = [queue_handler]
+    logging.getLogger(logger_name).propagate = False
+fastapi_logger.handlers = [queue_handler]
 fastapi_logger.setLevel(logger.level)
 
 
 
 # Authentication settings
 API_TOKEN = os.getenv("API_TOKEN", "itslive")
+# Comma separated list so tokens can be rotated without downtime
+_VALID_TOKENS = frozenset(token for token in API_TOKEN.split(",") if token)
+_SINGLE_TOKEN = next(iter(_VALID_TOKENS)).encode() if len(_VALID_TOKENS) == 1 else None
 API_KEY_NAME = "X-API-Token"
 DATABASE_URL = os.getenv("DATABASE_URL")
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
-# Process tracking
-process_lock = asyncio.Lock()
+# Job listings are polled by the UI, a short TTL absorbs repeated requests
+JOBS_CACHE_NAMESPACE = "jobs"
+JOBS_CACHE_TTL = 2
+# Every status a job can be in. The listing is cached per status, so anything
+# else is rejected with a 422 instead of growing the cache with one-off keys.
+JobStatusFilter = Literal[
+    "all", "pending", "processing", "running", "completed", "failed", "cancelled"
+]
+
+# Only one ingest runs at a time, keep its id in memory instead of scanning job files
+_active_job_id = None
+_active_job_loaded = False
+_active_job_lock = asyncio.Lock()
+# Jobs whose background task is running in this process
+_running_jobs = set()
 
 
 # Dependency for token authentication
 async def verify_token(api_key: str = Depends(api_key_header)):
-    if not API_TOKEN:
+    if not _VALID_TOKENS:
         logger.warning("API token not configured, allowing unauthenticated access")
         return True
 
@@ -64,7 +111,11 @@ async def verify_token(api_key: str = Depends(api_key_header)):
             detail="API token is missing",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if api_key != API_TOKEN:
+    if _SINGLE_TOKEN is not None:
+        valid = hmac.compare_digest(api_key.encode(), _SINGLE_TOKEN)
+    else:
+        valid = api_key in _VALID_TOKENS
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API token",
@@ -73,80 +124,296 @@ async def verify_token(api_key: str = Depends(api_key_header)):
     return True
 
 
+async def invalidate_jobs_cache():
+    """Drop cached job listings after a job is created or cancelled"""
+    await FastAPICache.clear(namespace=JOBS_CACHE_NAMESPACE)
+
+
+async def _get_active_job_id():
+    """Return the active job id, reading persisted job state only on cold start"""
+    global _active_job_id, _active_job_loaded
+    if not _active_job_loaded:
+        current_job = await tracker.ahas_active_jobs()
+        _active_job_id = current_job["job_id"] if current_job else None
+        _active_job_loaded = True
+    return _active_job_id
+
+
+async def start_exclusive_job(create_job):
+    """Create a job unless another one is active, returns (job_id, created)"""
+    global _active_job_id
+    async with _active_job_lock:
+        active_job_id = await _get_active_job_id()
+        if active_job_id:
+            return active_job_id, False
+        _active_job_id = await create_job()
+        return _active_job_id, True
+
+
+def release_active_job(job_id):
+    global _active_job_id
+    if _active_job_id == job_id:
+        _active_job_id = None
+
+
+async def run_exclusive_job(job_id, task, *args):
+    """Run a background task and free the active job slot when it finishes"""
+    _running_jobs.add(job_id)
+    try:
+        await task(*args)
+    finally:
+        _running_jobs.discard(job_id)
+        release_active_job(job_id)
+
+
+def job_in_progress_response(job_id):
+    return ORJSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "detail": f"Ingest job {job_id} is already in progress. Only one concurrent ingest is allowed.",
+            "status_code": 429,
+            "timestamp": _NOW_ISO,
+        },
+    )
+
+
 # Rate limiting
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_TIMEOUT = 0.2  # seconds, connecting to or waiting on Redis per request
+REDIS_RETRY_AFTER = 30  # seconds on the local limiter after a Redis failure
+
+# Sliding window on a sorted set: drop expired entries, count, insert if under limit
+RATE_LIMIT_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) >= limit then
+    return 0
+end
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('EXPIRE', key, window)
+return 1
+"""
+
+
 class RateLimiter:
-    def __init__(self, rate_limit=30, per_seconds=60):
+    """Per-client token bucket, keeps (tokens, last_seen) for at most max_clients
+
+    When a Redis client is attached the limit is shared across workers, the
+    in-process buckets are only used while Redis is unreachable.
+    """
+
+    def __init__(self, rate_limit=30, per_seconds=60, max_clients=10000):
         self.rate_limit = rate_limit
         self.per_seconds = per_seconds
-        self.requests = {}
+        self.refill_rate = rate_limit / per_seconds
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.redis = None
+        self._redis_script = None
+        # monotonic time before which Redis isn't tried again after a failure
+        self._redis_retry_at = 0.0
+
+    def attach_redis(self, client):
+        self.redis = client
+        self._redis_script = client.register_script(RATE_LIMIT_SCRIPT)
 
     async def check(self, client_id):
+        if self.redis is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                return await self._check_redis(client_id)
+            except Exception as e:
+                # Back off, so an unreachable Redis costs one timeout per window
+                # rather than one per request
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER
+                logger.warning(
+                    f"Redis rate limit check failed, using local limiter "
+                    f"for {REDIS_RETRY_AFTER}s: {e}"
+                )
+        return self._check_local(client_id)
+
+    async def _check_redis(self, client_id):
         now = time.time()
-        client_requests = self.requests.get(client_id, [])
+        allowed = await self._redis_script(
+            keys=[f"ratelimit:{client_id}"],
+            args=[now, self.per_seconds, self.rate_limit, f"{now}:{uuid.uuid4().hex}"],
+        )
+        return bool(allowed)
 
-        # Remove old requests
-        client_requests = [
-            req for req in client_requests if now - req < self.per_seconds
-        ]
+    def _check_local(self, client_id):
+        now = time.monotonic()
+        tokens, last = self.buckets.get(client_id, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - last) * self.refill_rate)
 
-        if len(client_requests) >= self.rate_limit:
+        if tokens < 1:
+            self.buckets[client_id] = (tokens, now)
+            self.buckets.move_to_end(client_id)
             return False
 
-        client_requests.append(now)
-        self.requests[client_id] = client_requests
+        self.buckets[client_id] = (tokens - 1, now)
+        self.buckets.move_to_end(client_id)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
         return True
 
 
 rate_limiter = RateLimiter()
 
 
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host
-
-    # Skip rate limiting for specific paths or local IPs
-    if (
-        request.url.path == "/health"
-        or client_ip.startswith("10.")
-        or client_ip.startswith("172.")
-    ):
-        return await call_next(request)
-    if not await rate_limiter.check(client_ip):
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "detail": "Rate limit exceeded",
-                "status_code": 429,
-                "timestamp": datetime.now().isoformat(),
-            },
+def _refresh_static_bodies():
+    """Refresh the cached timestamp and the JSON bodies that only depend on it"""
+    global _NOW_ISO, _RATE_LIMIT_BODY, _HEALTH_BODY
+    _NOW_ISO = timestamp = datetime.now().isoformat(timespec="seconds")
+    _RATE_LIMIT_BODY = orjson.dumps(
+        {
+            "detail": "Rate limit exceeded",
+            "status_code": 429,
+            "timestamp": timestamp,
+        }
+    )
+    _HEALTH_BODY = orjson.dumps({"status": "ok", "timestamp": timestamp})
+
+
+# Status timestamps don't need sub-second precision, they are refreshed once per second
+_NOW_ISO = ""
+_RATE_LIMIT_BODY = b""
+_HEALTH_BODY = b""
+_refresh_static_bodies()
+_background_tasks = []
+
+
+async def _static_bodies_ticker():
+    while True:
+        await asyncio.sleep(1)
+        _refresh_static_bodies()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    _background_tasks.append(asyncio.create_task(_static_bodies_ticker()))
+    FastAPICache.init(InMemoryBackend())
+    await open_database_pool()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    await close_database_pool()
+    await close_async_s3()
+    pgstac_loaders.close()
+    await pgstac_workers.close()
+    # Write out job progress still held in memory by the tracker
+    await asyncio.to_thread(tracker.close)
+
+
+@app.on_event("startup")
+async def connect_rate_limit_backend():
+    if not REDIS_URL:
+        return
+    import redis.asyncio as aioredis
+
+    rate_limiter.attach_redis(
+        aioredis.from_url(
+            REDIS_URL,
+            socket_connect_timeout=REDIS_TIMEOUT,
+            socket_timeout=REDIS_TIMEOUT,
         )
+    )
+    logger.info("Rate limiting backed by Redis")
+
+
+@app.on_event("shutdown")
+async def close_rate_limit_backend():
+    if rate_limiter.redis is not None:
+        await rate_limiter.redis.aclose()
+
+
+# Private (RFC 1918) client ranges are never rate limited
+_PRIVATE_IP_RE = re.compile(r"^(?:10\.|192\.168\.|172\.(?:1[6-9]|2\d|3[01])\.)")
+
+
+class RateLimitMiddleware:
+    """Pure ASGI rate limiting middleware keyed on the client IP"""
 
-    return await call_next(request)
+    def __init__(self, app):
+        self.app = app
+        # Paths that are never rate limited
+        self._skip_paths = frozenset(("/health",))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self._skip_paths:
+            return await self.app(scope, receive, send)
+
+        client = scope.get("client")
+        client_ip = client[0] if client else ""
+        if _PRIVATE_IP_RE.match(client_ip):
+            return await self.app(scope, receive, send)
+        if not await rate_limiter.check(client_ip):
+            body = _RATE_LIMIT_BODY
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status.HTTP_429_TOO_MANY_REQUESTS,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
 
 
 # Performance monitoring middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    logger.info(
-        f"Request to {request.url.path} processed in {process_time:.4f} seconds"
-    )
-    return response
+class ProcessTimeMiddleware:
+    """Pure ASGI middleware adding an X-Process-Time header to responses"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start_ns = time.monotonic_ns()
+
+        async def send_with_process_time(message):
+            if message["type"] == "http.response.start":
+                process_time = (time.monotonic_ns() - start_ns) / 1_000_000_000
+                headers = message.setdefault("headers", [])
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers)
+                headers.append((b"x-process-time", f"{process_time:.6f}".encode()))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        f"Request to {scope['path']} processed in {process_time:.4f} seconds"
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
+
+# The last middleware added is the outermost one
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(ProcessTimeMiddleware)
 
 
 @app.get("/health")
 async def health_check():
     logger.info("🚀 Application is healthy!")
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 @app.get("/database")
 async def database_test():
-    check = await run_in_threadpool(check_database_connection)
+    check = await check_database_connection()
     return {"status": check,
-            "timestamp": datetime.now().isoformat()}
+            "timestamp": _NOW_ISO}
 
 @app.post("/ingest", dependencies=[Depends(verify_token)])
 async def create_ingest_job(
@@ -157,20 +424,14 @@ async def create_ingest_job(
     collection_id: str = Query(None, description="Collection ID for configuration-based ingestion"),
     background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
-    current_job = await run_in_threadpool(tracker.has_active_jobs)
-    if current_job:
-        job_id = current_job["job_id"]
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "detail": f"Ingest job {job_id} is already in progress. Only one concurrent ingest is allowed.",
-                "status_code": 429,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+    job_id, created = await start_exclusive_job(
+        lambda: tracker.acreate_job(bucket, path, recursive, year, collection_id)
+    )
+    if not created:
+        return job_in_progress_response(job_id)
 
-    job_id = await run_in_threadpool(tracker.create_job, bucket, path, recursive, year, collection_id)
-    background_tasks.add_task(process_files, job_id)
+    await invalidate_jobs_cache()
+    background_tasks.add_task(run_exclusive_job, job_id, process_files, job_id)
 
     return {
         "job_id": job_id,
@@ -188,20 +449,14 @@ async def create_granule_ingest_job(
     background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     """Create granule ingestion job from URL/endpoint"""
-    current_job = await run_in_threadpool(tracker.has_active_jobs)
-    if current_job:
-        job_id = current_job["job_id"]
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "detail": f"Ingest job {job_id} is already in progress. Only one concurrent ingest is allowed.",
-                "status_code": 429,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+    job_id, created = await start_exclusive_job(
+        lambda: tracker.acreate_job("granules", url, False, None, "velocity-granules")
+    )
+    if not created:
+        return job_in_progress_response(job_id)
 
-    job_id = await run_in_threadpool(tracker.create_job, "granules", url, False, None, "velocity-granules")
-    background_tasks.add_task(process_granules_from_url, job_id, url)
+    await invalidate_jobs_cache()
+    background_tasks.add_task(run_exclusive_job, job_id, process_granules_from_url, job_id, url)
 
     return {
         "job_id": job_id,
@@ -220,22 +475,17 @@ async def ingest_dummy_task(
     tasks_to_run: int = Query(1, description="Number of tasks to run"),
     concurrent_tasks: int = Query(1, description="Number of concurrent tasks to run"),
 ):
-    current_job = await run_in_threadpool(tracker.has_active_jobs)
-    logger.info(f"Current job: {current_job}")
-    if current_job:
-        logger.warning(f"Dummy task already in progress: {current_job}")
-        job_id = current_job["job_id"]
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "detail": f"Ingest job {job_id} is already in progress. Only one concurrent ingest is allowed.",
-                "status_code": 429,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+    job_id, created = await start_exclusive_job(
+        lambda: tracker.acreate_job("dummy", name, False, None)
+    )
+    if not created:
+        logger.warning(f"Dummy task already in progress: {job_id}")
+        return job_in_progress_response(job_id)
 
-    job_id = await run_in_threadpool(tracker.create_job, "dummy", name, False, None)
-    background_tasks.add_task(dummy_task, job_id, name, tasks_to_run, concurrent_tasks)
+    await invalidate_jobs_cache()
+    background_tasks.add_task(
+        run_exclusive_job, job_id, dummy_task, job_id, name, tasks_to_run, concurrent_tasks
+    )
     return {
         "job_id": job_id,
         "status": "pending",
@@ -251,17 +501,23 @@ async def initialize_database(
     background_tasks: BackgroundTasks = BackgroundTasks(),
     migrate: bool = Query(False, description="Run database migrations if needed"),
 ):
-    job_id = await run_in_threadpool(tracker.create_job, "initdb", "", False, None)
-    await run_in_threadpool(
-        tracker.update_job,  # Pass the function reference
-        job_id,  # Pass the first argument
-        lambda data: {  # Pass the second argument (the lambda)
-            "parameters": {"task": "initdb", "migrate": migrate, **data["parameters"]},
-            **data,
-        },
-    )
+    async def create_initdb_job():
+        job_id = await tracker.acreate_job("initdb", "", False, None)
+        await tracker.aupdate_job(
+            job_id,
+            lambda data: data["parameters"].update({"task": "initdb", "migrate": migrate}),
+        )
+        return job_id
 
-    background_tasks.add_task(initialize_database_task, job_id, migrate)
+    # Migrations must not run underneath an ingest, or another migration
+    job_id, created = await start_exclusive_job(create_initdb_job)
+    if not created:
+        return job_in_progress_response(job_id)
+
+    await invalidate_jobs_cache()
+    background_tasks.add_task(
+        run_exclusive_job, job_id, initialize_database_task, job_id, migrate
+    )
 
     return {
         "job_id": job_id,
@@ -270,21 +526,30 @@ async def initialize_database(
     }
 
 
+@cache(expire=JOBS_CACHE_TTL, namespace=JOBS_CACHE_NAMESPACE)
+async def get_job_summary(job_id: str):
+    return await tracker.aget_job(job_id, False)
+
+
 @app.get("/jobs/{job_id}")
 async def get_job_status(
     job_id: str, details: bool = Query(False, description="Show detailed file statuses")
 ):
-    job_data = await run_in_threadpool(tracker.get_job, job_id, details)
+    if details:
+        job_data = await tracker.aget_job(job_id, details)
+    else:
+        job_data = await get_job_summary(job_id)
     if not job_data:
         raise HTTPException(status_code=404, detail="Job not found")
     return job_data
 
 
 @app.get("/jobs/page/{page_number}/status/{status}")
-async def list_jobs_page(page_number: int = 0, status: str = "all"):
-    jobs_count = await run_in_threadpool(tracker.count_jobs, status)
-    jobs_list = await run_in_threadpool(
-        tracker.list_jobs, page_number=page_number, status=status
+@cache(expire=JOBS_CACHE_TTL, namespace=JOBS_CACHE_NAMESPACE)
+async def list_jobs_page(page_number: int = 0, status: JobStatusFilter = "all"):
+    jobs_count, jobs_list = await asyncio.gather(
+        tracker.acount_jobs(status),
+        tracker.alist_jobs(page_number=page_number, status=status),
     )
     return {
         "total": jobs_count,
@@ -293,29 +558,44 @@ async def list_jobs_page(page_number: int = 0, status: str = "all"):
 
 
 @app.get("/jobs")
+@cache(expire=JOBS_CACHE_TTL, namespace=JOBS_CACHE_NAMESPACE)
 async def list_jobs():
-    jobs = await run_in_threadpool(tracker.list_jobs)
+    jobs = await tracker.alist_jobs()
     return {"jobs": jobs}
 
 
+async def terminate_process(proc, timeout=5):
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), timeout=timeout)
+    except (ProcessLookupError, asyncio.TimeoutError):
+        pass
+
+
 @app.post("/jobs/{job_id}/cancel", dependencies=[Depends(verify_token)])
 async def cancel_job(job_id: str):
-    cancelled_job = await run_in_threadpool(tracker.cancel_job, job_id)
+    cancelled_job = await tracker.acancel_job(job_id)
     if not cancelled_job:
         raise HTTPException(status_code=404, detail="Job not found")
+    # A running task keeps the slot until it has actually stopped, an in-process
+    # load can't be interrupted. Only a job left over from an earlier process
+    # has nothing that would release it.
+    if job_id not in _running_jobs:
+        release_active_job(job_id)
+    await invalidate_jobs_cache()
 
-    async with process_lock:
-        processes = active_processes.get(job_id, [])
-        for proc in processes:
-            try:
-                proc.terminate()
-                await asyncio.wait_for(proc.wait(), timeout=5)
-            except (ProcessLookupError, asyncio.TimeoutError):
-                pass
-        if job_id in active_processes:
-            del active_processes[job_id]
+    processes = active_processes.pop(job_id, [])
+
+    await asyncio.gather(
+        *(terminate_process(proc) for proc in processes), return_exceptions=True
+    )
 
-    return {"status": "cancelled", "message": "Terminated all subprocesses"}
+    if PGSTAC_SUBPROCESS:
+        message = "Terminated all subprocesses"
+    else:
+        # In-process loads can't be killed, they finish before the job stops
+        message = "Remaining files skipped, loads in progress finish first"
+    return {"status": "cancelled", "message": message}
 
 
 # Run if called directly
@@ -323,4 +603,6 @@ if __name__ == "__main__":
     import uvicorn
     logger.info("Starting ingest service app...")
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Logging is configured above, keep uvicorn from installing its own handlers.
+    # uvloop has a much cheaper subprocess transport than the default loop.
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None, loop="uvloop")
@@ -0,0 +1,35 @@
+"""Long-lived pypgstac loader used by tasks.PgstacWorkerPool.
+
+Reads one NDJSON file path per line on stdin, loads it with insert_ignore and
+answers each path with a single JSON line on stdout: {"ok": true} or
+{"ok": false, "error": "..."}. Keeping the process alive means pypgstac and its
+dependencies are imported once instead of once per file.
+"""
+
+import json
+import os
+import sys
+
+from pypgstac.db import PgstacDB
+from pypgstac.load import Loader, Methods
+
+
+def main():
+    dsn = os.getenv("DATABASE_URL")
+    with PgstacDB(dsn=dsn) as db:
+        loader = Loader(db=db)
+        for line in sys.stdin:
+            path = line.strip()
+            if not path:
+                continue
+            try:
+                loader.load_items(path, insert_mode=Methods.insert_ignore)
+                response = {"ok": True}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
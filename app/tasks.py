@@ -1,16 +1,29 @@
 import os
+import sys
+import json
 import asyncio
 import random
+import time
+from contextlib import AsyncExitStack
+import aioboto3
+import aiofiles
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore import UNSIGNED
 from botocore.compat import total_seconds
 from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
 from datetime import datetime
 import logging
 from tracker import active_processes, metadata_cache, job_tracker as tracker
 
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+from pypgstac.db import PgstacDB
+from pypgstac.load import Loader, Methods
 from sqlalchemy import create_engine, text
 
 # Configuration
@@ -18,8 +31,18 @@ MAX_CONCURRENT_FILES = int(os.getenv("MAX_CONCURRENT_FILES", 2))
 PROCESS_SEM = asyncio.Semaphore(MAX_CONCURRENT_FILES)
 TMP_DIR = Path(os.getenv("TMP_DIR", "/tmp/shared"))
 TMP_DIR.mkdir(parents=True, exist_ok=True)
+DISCOVERY_WORKERS = 8
 MAX_SIZE = int(os.getenv("MAX_FILE_SIZE_MB", 1500)) * 1024 * 1024
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Built once, the pypgstac command prefix and DSN never change per call
+_PYPGSTAC = ("micromamba", "run", "-p", "/opt/conda", "pypgstac")
+_DSN_ARG = f"--dsn={DATABASE_URL}"
+# Load files in separate processes instead of the in-process API: streamed into
+# a `pypgstac load items` per file, or staged and handed to a long-lived worker
+PGSTAC_SUBPROCESS = os.getenv("PGSTAC_SUBPROCESS", "false").lower() in ("1", "true", "yes")
+PGSTAC_WORKER_SCRIPT = Path(__file__).with_name("pgstac_worker.py")
+# Stream S3 objects into pypgstac instead of staging a temporary file first
+STREAM_INGEST = os.getenv("STREAM_INGEST", "true").lower() in ("1", "true", "yes")
 
 # Setup logging
 logging.basicConfig(
@@ -28,25 +51,58 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-process_lock = asyncio.Lock()
-CACHE_TTL = 3600  
+db_pool = None
+# One engine for the process so migrations reuse pooled connections
+ENGINE = (
+    create_engine(
+        DATABASE_URL,
+        pool_size=MAX_CONCURRENT_FILES + 2,
+        pool_pre_ping=True,
+        future=True,
+    )
+    if DATABASE_URL
+    else None
+)
+# Large objects are fetched with parallel ranged GETs, one stream is capped by a single connection
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
 s3 = boto3.client(
     "s3",
     config=Config(
         signature_version=UNSIGNED,
-        max_pool_connections=20,  # Increased connection pool
+        # Shared by worker threads, every concurrent file may run a full ranged download
+        max_pool_connections=max(20, MAX_CONCURRENT_FILES * TRANSFER_CONFIG.max_concurrency),
     ),
 )
+# Async client for the download hot path, see get_async_s3
+async_s3_session = aioboto3.Session()
+async_s3_stack = AsyncExitStack()
+async_s3_lock = asyncio.Lock()
+async_s3 = None
+
+
+def list_files(directory: str, suffix: str):
+    """Sorted names of the regular files in directory ending with suffix"""
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
+        )
 
 
-def run_migrations(engine):
+def run_migrations():
     migration_dir = "migrations"
 
     if not os.path.isdir(migration_dir):
         logger.info(f"Migration directory '{migration_dir}' not found.")
         return
 
-    with engine.begin() as conn:  # auto-commits or rolls back on failure
+    with ENGINE.begin() as conn:  # auto-commits or rolls back on failure
         # 1. Create tracking table if it doesn't exist
         conn.execute(
             text("""
@@ -58,15 +114,17 @@ def run_migrations(engine):
         )
 
         # 2. Collect all SQL files sorted by filename
-        files = sorted(f for f in os.listdir(migration_dir) if f.endswith(".sql"))
+        files = list_files(migration_dir, ".sql")
+
+        # 3. Fetch the already applied migrations in a single query
+        applied = {
+            row[0]
+            for row in conn.execute(text("SELECT filename FROM schema_migrations")).all()
+        }
+        newly_applied = []
 
         for filename in files:
-            # 3. Check if the file has already been applied
-            result = conn.execute(
-                text("SELECT 1 FROM schema_migrations WHERE filename = :filename"),
-                {"filename": filename},
-            )
-            if result.scalar():
+            if filename in applied:
                 logger.info(f"✓ {filename} already applied, skipping")
                 continue
 
@@ -77,22 +135,43 @@ def run_migrations(engine):
                 sql = f.read()
                 conn.execute(text(sql))  # Execute file content
 
-            # 5. Record the migration as applied
+            newly_applied.append({"filename": filename, "applied_at": datetime.utcnow()})
+            logger.info(f"✅ {filename} applied")
+
+        # 5. Record the new migrations as applied, in the same transaction
+        if newly_applied:
             conn.execute(
                 text(
                     "INSERT INTO schema_migrations (filename, applied_at) VALUES (:filename, :applied_at)"
                 ),
-                {"filename": filename, "applied_at": datetime.utcnow()},
+                newly_applied,
             )
-            logger.info(f"✅ {filename} applied")
     logger.info("🎉 All migrations complete.")
 
 
-def check_database_connection():
+async def open_database_pool():
+    """Open the async connection pool used for lightweight queries"""
+    global db_pool
+    if not DATABASE_URL:
+        logger.warning("DATABASE_URL not configured, database pool not created")
+        return
+    db_pool = AsyncConnectionPool(DATABASE_URL, min_size=1, max_size=4, open=False)
+    await db_pool.open()
+
+
+async def close_database_pool():
+    global db_pool
+    if db_pool is not None:
+        await db_pool.close()
+        db_pool = None
+
+
+async def check_database_connection():
     try:
-        engine = create_engine(DATABASE_URL)
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        if db_pool is None:
+            raise Exception("Database pool is not initialized")
+        async with db_pool.connection(timeout=5) as conn:
+            await conn.execute("SELECT 1")
         logger.info("Database connection successful.")
         return True
     except Exception as e:
@@ -100,6 +179,21 @@ def check_database_connection():
         return False
 
 
+async def run_bounded(coros, limit=MAX_CONCURRENT_FILES):
+    """Run coroutines concurrently, at most limit at a time, raising the first error"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    results = await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
 async def load_collections():
     collections_dir = "migrations/collections"
     try:
@@ -107,34 +201,36 @@ async def load_collections():
             logger.error(f"Collections directory '{collections_dir}' not found.")
             return False
             
-        files = sorted(f for f in os.listdir(collections_dir) if f.endswith(".json"))
+        files = list_files(collections_dir, ".json")
         if not files:
             logger.warning("No collection files found.")
             return True
             
         logger.info(f"Loading {len(files)} collections: {files}")
-        
-        for filename in files:
+
+        async def load_one(filename):
             logger.info(f"🔁 Inserting collection: {filename}...")
 
             file_path = os.path.join(collections_dir, filename)
 
             proc = await asyncio.create_subprocess_exec(
-                "micromamba", "run", "-p", "/opt/conda", "pypgstac",
+                *_PYPGSTAC,
                 "load",
                 "collections",
                 file_path,
-                f"--dsn={DATABASE_URL}",
+                _DSN_ARG,
                 "--method=insert_ignore",
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
 
-            stdout, stderr = await proc.communicate()
+            output, _ = await proc.communicate()
             if proc.returncode != 0:
-                raise Exception(f"Database migration failed: {stderr.decode().strip()}")
+                raise Exception(f"Database migration failed: {output.decode().strip()}")
 
             logger.info(f"Collection {filename} loaded successfully 🎉")
+
+        await run_bounded(load_one(filename) for filename in files)
     except Exception as e:
         logger.error(f"Failed to load collections: {str(e)}")
         return False
@@ -149,35 +245,37 @@ async def load_queryables(index_fields: list):
             logger.error(f"Queryables directory '{queryables_dir}' not found.")
             return False
             
-        files = sorted(f for f in os.listdir(queryables_dir) if f.endswith(".json"))
+        files = list_files(queryables_dir, ".json")
         if not files:
             logger.warning("No queryable files found.")
             return True
             
         logger.info(f"Loading {len(files)} queryable files: {files}")
-        
-        for filename in files:
+
+        async def load_one(filename):
             logger.info(f"🔁 Inserting queryables: {filename}...")
 
             file_path = os.path.join(queryables_dir, filename)
 
             proc = await asyncio.create_subprocess_exec(
-                "micromamba", "run", "-p", "/opt/conda", "pypgstac",
+                *_PYPGSTAC,
                 "load_queryables",
                 file_path,
-                f"--dsn={DATABASE_URL}",
+                _DSN_ARG,
                 f"--index-fields={','.join(index_fields)}",
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
 
-            stdout, stderr = await proc.communicate()
+            output, _ = await proc.communicate()
             if proc.returncode != 0:
                 raise Exception(
-                    f"Database migration for queryables failed: {stderr.decode().strip()}"
+                    f"Database migration for queryables failed: {output.decode().strip()}"
                 )
 
             logger.info(f"Queryables {filename} loaded successfully 🎉")
+
+        await run_bounded(load_one(filename) for filename in files)
     except Exception as e:
         logger.error(f"Failed to load queryables: {str(e)}")
         return False
@@ -196,7 +294,7 @@ async def load_items_from_files():
         return True
         
     try:
-        files = sorted(f for f in os.listdir(items_dir) if f.endswith(".json"))
+        files = list_files(items_dir, ".json")
         if not files:
             logger.info("No item files found to load.")
             return True
@@ -218,24 +316,24 @@ async def load_items_from_files():
             logger.info(f"Loading items for collection: {collection_name}")
 
             proc = await asyncio.create_subprocess_exec(
-                "micromamba", "run", "-p", "/opt/conda", "pypgstac",
+                *_PYPGSTAC,
                 "load",
                 "items",
                 file_path,
                 "--method=insert_ignore",
-                f"--dsn={DATABASE_URL}",
+                _DSN_ARG,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
 
-            stdout, stderr = await proc.communicate()
+            output, _ = await proc.communicate()
             if proc.returncode != 0:
-                raise Exception(f"Failed to load items from {filename}: {stderr.decode().strip()}")
+                raise Exception(f"Failed to load items from {filename}: {output.decode().strip()}")
 
             # Log success with item count if available
-            stdout_str = stdout.decode().strip()
-            if stdout_str:
-                logger.info(f"pypgstac output: {stdout_str}")
+            output_str = output.decode().strip()
+            if output_str:
+                logger.info(f"pypgstac output: {output_str}")
             logger.info(f"Items from {filename} loaded successfully 🎉")
             
     except Exception as e:
@@ -245,48 +343,46 @@ async def load_items_from_files():
     return True
 
 
+def set_job_fields(**fields):
+    """Build an update callback that sets top-level job fields in place"""
+    def update(data):
+        data.update(fields)
+
+    return update
+
+
 async def initialize_database_task(job_id: str, migrate: bool):
     try:
         tracker.update_job(
             job_id,
-            lambda data: data.update(
-                {
-                    **data,
-                    "status": "processing",
-                    "message": "Starting database initialization",
-                }
+            set_job_fields(
+                status="processing", message="Starting database initialization"
             ),
         )
-        engine = create_engine(DATABASE_URL)
 
         # Run migrations if requested
         if migrate:
             tracker.update_job(
-                job_id,
-                lambda data: data.update(
-                    {**data, "message": "Running database migrations"}
-                ),
+                job_id, set_job_fields(message="Running database migrations")
             )
 
             proc = await asyncio.create_subprocess_exec(
-                "micromamba", "run", "-p", "/opt/conda", "pypgstac",
+                *_PYPGSTAC,
                 "migrate",
-                f"--dsn={DATABASE_URL}",
+                _DSN_ARG,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
             logger.info(f"Running migrations with command: pypgstac migrate")
 
-            stdout, stderr = await proc.communicate()
+            output, _ = await proc.communicate()
 
             if proc.returncode != 0:
-                raise Exception(f"Database migration failed: {stderr.decode().strip()}")
+                raise Exception(f"Database migration failed: {output.decode().strip()}")
 
             tracker.update_job(
                 job_id,
-                lambda data: data.update(
-                    {**data, "message": "Built-in database migrations complete"}
-                ),
+                set_job_fields(message="Built-in database migrations complete"),
             )
 
         # Load collections
@@ -302,17 +398,14 @@ async def initialize_database_task(job_id: str, migrate: bool):
             raise Exception("Failed to load queryables")
             
         # Run custom migrations
-        run_migrations(engine)
+        run_migrations()
 
         tracker.update_job(
             job_id,
-            lambda data: data.update(
-                {
-                    **data,
-                    "status": "completed",
-                    "message": "Database initialization completed successfully 🎉",
-                    "completed_at": datetime.now().isoformat(),
-                }
+            set_job_fields(
+                status="completed",
+                message="Database initialization completed successfully 🎉",
+                completed_at=datetime.now().isoformat(),
             ),
         )
 
@@ -320,13 +413,10 @@ async def initialize_database_task(job_id: str, migrate: bool):
         logger.error(f"Database initialization failed: {str(e)}")
         tracker.update_job(
             job_id,
-            lambda data: data.update(
-                {
-                    **data,
-                    "status": "failed",
-                    "error": str(e),
-                    "completed_at": datetime.now().isoformat(),
-                }
+            set_job_fields(
+                status="failed",
+                error=str(e),
+                completed_at=datetime.now().isoformat(),
             ),
         )
 
@@ -338,66 +428,62 @@ async def process_files(job_id: str):
             return
 
         params = job_data["parameters"]
-        files = discover_files(
+        files = await asyncio.to_thread(
+            discover_files,
             params["bucket"], params["path"], params["recursive"], params["year"], params.get("collection_id")
         )
 
         tracker.update_job(
             job_id,
             lambda data: data["summary"].update(
-                {**data["summary"], "total_files": len(files), "progress": 0.0}
+                {"total_files": len(files), "progress": 0.0}
             ),
         )
         total_files = len(files)
+        bucket = params["bucket"]
+        ingested = await asyncio.to_thread(tracker.build_success_index)
 
-        for batch_start in range(0, total_files):
-            job = tracker.get_job(job_id)
-            logger.info(f"Processing batch for job {job_id}")
-            if job and job.get("status") == "cancelled":
-                tracker.update_job(
-                    job_id,
-                    lambda data: data.update(
-                        {
-                            **data,
-                            "status": "cancelled",
-                            "error": "Job was cancelled during processing",
-                        }
-                    ),
-                )
-                break
+        # HEAD every file up front in parallel, process_file then hits the cache
+        prefetched = await asyncio.to_thread(
+            tracker.get_file_metadata_many, bucket, [key for _, key in files]
+        )
+        for key, metadata in prefetched.items():
+            metadata_cache[f"{bucket}:{key}"] = metadata
 
-            logger.info(f"Job: {batch_start}, Job status: {job.get('status')}")
-            bucket = params["bucket"]
-            key = files[batch_start][1]
-            await process_file(job_id, bucket, key, batch_start, total_files)
+        async def process_bounded(index):
+            async with PROCESS_SEM:
+                key = files[index][1]
+                logger.info(f"Job {job_id}: processing file {index + 1}/{total_files}")
+                await process_file(job_id, bucket, key, index, total_files, ingested)
+
+        tasks = [asyncio.create_task(process_bounded(i)) for i in range(total_files)]
+        watcher = asyncio.create_task(watch_for_cancellation(job_id, tasks))
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            watcher.cancel()
 
         current_status = tracker.get_job(job_id).get("status")
-        if current_status != "cancelled":
+        if current_status == "cancelled":
             tracker.update_job(
                 job_id,
-                lambda data: data.update(
-                    {
-                        **data,
-                        "status": "completed",
-                        "summary": {
-                            "progress": 100.0,
-                            "processed": len(files),
-                            "succeeded": data["summary"]["succeeded"],
-                            "failed": data["summary"]["failed"],
-                        },
-                    }
+                set_job_fields(
+                    status="cancelled", error="Job was cancelled during processing"
                 ),
             )
+        else:
+
+            def mark_completed(data):
+                data["status"] = "completed"
+                data["summary"].update({"progress": 100.0, "processed": len(files)})
+
+            tracker.update_job(job_id, mark_completed)
 
     except asyncio.CancelledError:
         tracker.update_job(
             job_id,
-            lambda data: data.update(
-                {
-                    **data,
-                    "status": "cancelled",
-                    "error": "Job was cancelled during processing",
-                }
+            set_job_fields(
+                status="cancelled", error="Job was cancelled during processing"
             ),
         )
         raise
@@ -405,23 +491,55 @@ async def process_files(job_id: str):
         logger.error(f"Job processing failed: {str(e)}")
         tracker.update_job(
             job_id,
-            lambda data: data.update({**data, "status": "failed", "error": str(e)}),
+            set_job_fields(status="failed", error=str(e)),
         )
 
 
-async def process_file(job_id: str, bucket: str, key: str, index: int, total: int):
+async def watch_for_cancellation(job_id: str, tasks: list, interval: float = 5):
+    """Cancel the remaining file tasks once the job is marked as cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        job = tracker.get_job(job_id)
+        if job and job.get("status") == "cancelled":
+            logger.info(f"Job {job_id} was cancelled, stopping pending files")
+            for task in tasks:
+                task.cancel()
+            return
+
+
+def mark_file_failed(s3_path: str, status: str, error: str):
+    """Build an update callback recording a file that did not make it into pgstac.
+
+    The processed and failed counters go through tracker.update_job_counter.
+    """
+    def update(data):
+        data["details"][s3_path] = {
+            "status": status,
+            "error": error,
+            "completed_at": datetime.now().isoformat(),
+        }
+
+    return update
+
+
+async def process_file(
+    job_id: str, bucket: str, key: str, index: int, total: int, ingested: dict = None
+):
     s3_path = f"s3://{bucket}/{key}"
-    tmp_path = TMP_DIR / f"{job_id}_{os.path.basename(key)}"
+    loaded = False
+    # The index keeps files with the same name in different folders apart,
+    # they can be in flight at the same time
+    tmp_path = TMP_DIR / f"{job_id}_{index}_{os.path.basename(key)}"
     proc = None
 
     try:
         # Use cached metadata if available
         cache_key = f"{bucket}:{key}"
-        if cache_key in metadata_cache:
-            metadata = metadata_cache[cache_key]
+        metadata = metadata_cache.get(cache_key)
+        if metadata is not None:
             logger.info(f"Using cached metadata for {cache_key}")
         else:
-            metadata = tracker.get_file_metadata(bucket, key)
+            metadata = await asyncio.to_thread(tracker.get_file_metadata, bucket, key)
             metadata_cache[cache_key] = metadata
             logger.info(f"Fetched metadata for {cache_key}")
 
@@ -429,45 +547,41 @@ async def process_file(job_id: str, bucket: str, key: str, index: int, total: in
         etag = metadata["etag"]
 
         # Check for existing successful ingest
-        existing = check_existing_ingest(job_id, bucket, key, size_mb, etag)
+        if ingested is None:
+            ingested = await asyncio.to_thread(tracker.build_success_index)
+        previous = ingested.get(s3_path)
+        existing = (
+            previous is not None
+            and previous["size_mb"] == size_mb
+            and previous["etag"] == etag
+        )
 
         if existing:
             logger.info(f"File {s3_path} already ingested successfully, skipping")
-            tracker.update_job(
-                job_id,
-                lambda data: {
-                    **data,
-                    "summary": {
-                        "total_files": data["summary"]["total_files"],
-                        "processed": data["summary"]["processed"] + 1,
-                        "skipped": data["summary"].get("skipped", 0) + 1,
-                        "succeeded": data["summary"]["succeeded"],
-                        "failed": data["summary"]["failed"],
-                    },
-                    "details": {
-                        **data["details"],
-                        s3_path: {
-                            "status": "skipped",
-                            "reason": "Duplicate file - already ingested with same size and checksum",
-                            "size_mb": size_mb,
-                            "etag": etag,
-                            "skipped_at": datetime.now().isoformat(),
-                        },
-                    },
-                },
-            )
+
+            def mark_skipped(data):
+                data["details"][s3_path] = {
+                    "status": "skipped",
+                    "reason": "Duplicate file - already ingested with same size and checksum",
+                    "size_mb": size_mb,
+                    "etag": etag,
+                    "skipped_at": datetime.now().isoformat(),
+                }
+
+            tracker.update_job(job_id, mark_skipped)
+            tracker.update_job_counter(job_id, processed=1, skipped=1)
             return
 
+        # Timing uses the monotonic clock, started_at is for display only. The
+        # monotonic value means nothing outside this process, so it stays local.
+        started = time.monotonic()
         tracker.update_job(
             job_id,
-            lambda data: data["details"].update(
+            lambda data: data["details"].setdefault(s3_path, {}).update(
                 {
-                    s3_path: {
-                        **data["details"].get(s3_path, {}),
-                        "status": "processing",
-                        "started_at": datetime.now().isoformat(),
-                        "size_mb": metadata["size_bytes"] / 1024 / 1024,
-                    }
+                    "status": "processing",
+                    "started_at": datetime.now().isoformat(),
+                    "size_mb": metadata["size_bytes"] / 1024 / 1024,
                 }
             ),
         )
@@ -479,155 +593,372 @@ async def process_file(job_id: str, bucket: str, key: str, index: int, total: in
                 f"({metadata['size_bytes'] / 1024 / 1024:.2f}MB > {MAX_SIZE / 1024 / 1024}MB)"
             )
 
-        # Fetch file with optimized chunk size
-        logger.info(f"Downloading {s3_path} to {tmp_path}")
-        download_file(bucket, key, tmp_path)
-
-        count_proc = await asyncio.create_subprocess_exec(
-            "wc",
-            "-l",
-            str(tmp_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await count_proc.communicate()
-
-        if count_proc.returncode != 0:
-            raise Exception(f"Count failed: {stderr.decode().strip()}")
-
-        try:
-            count = int(stdout.decode().strip().split()[0])
-        except (IndexError, ValueError) as e:
-            raise Exception(f"Invalid count output: {stdout.decode()}, Error: {e}")
-
-        proc = await asyncio.create_subprocess_exec(
-            "micromamba", "run", "-p", "/opt/conda", "pypgstac",
-            "load",
-            "items",
-            str(tmp_path),
-            "--method=insert_ignore",
-            f"--dsn={DATABASE_URL}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        async with process_lock:
-            active_processes[job_id].append(proc)
+        def record_loaded(count):
+            nonlocal loaded
+            loaded = True
+            logger.info(f"File {s3_path} processed successfully 🎉")
+            tracker.record_success(s3_path, size_mb, etag)
 
-        stdout, stderr = await proc.communicate()
-
-        if proc.returncode != 0:
-            raise Exception(f"PGStac failed: {stderr.decode().strip()}")
-        logger.info(f"File {s3_path} processed successfully 🎉")
-
-        tracker.update_job(
-            job_id,
-            lambda data: {
-                **data,
-                "summary": {
-                    **data["summary"],
-                    "processed": data["summary"]["processed"] + 1,
-                    "succeeded": data["summary"]["succeeded"] + 1,
-                    "progress": (data["summary"].get("processed", 0) + 1) / total * 100,
-                },
-                "details": {
-                    **data["details"],
-                    s3_path: {
-                        **data["details"].get(s3_path, {}),
+            def mark_succeeded(data):
+                data["details"].setdefault(s3_path, {}).update(
+                    {
                         "status": "success",
                         "item_count": count,
                         "size_mb": round(size_mb, 2),
                         "etag": etag,
                         "completed_at": datetime.now().isoformat(),
-                        "ingest_time": round((datetime.now() - datetime.fromisoformat(data["details"][s3_path]["started_at"])).total_seconds() / 60)
-                    },
-                },
-            },
-        )
+                        "ingest_time": round((time.monotonic() - started) / 60)
+                    }
+                )
+
+            tracker.update_job(job_id, mark_succeeded)
+            # Progress is recomputed from total_files when the deltas are applied
+            tracker.update_job_counter(job_id, processed=1, succeeded=1)
+
+        if not PGSTAC_SUBPROCESS:
+            if STREAM_INGEST:
+                # The loader reads the object's lines as they arrive from S3
+                logger.info(f"Streaming {s3_path} into pgstac")
+                lines = S3LineStream(bucket, key)
+                await pgstac_loaders.load_items(
+                    lines, on_loaded=lambda: record_loaded(lines.count)
+                )
+                count = lines.count
+            else:
+                logger.info(f"Downloading {s3_path} to {tmp_path}")
+                count = await download_file(bucket, key, tmp_path, metadata["size_bytes"])
+                await pgstac_loaders.load_items(
+                    str(tmp_path), on_loaded=lambda: record_loaded(count)
+                )
+        else:
+            if STREAM_INGEST:
+                # Pipe S3 bytes straight into pypgstac, no temporary file
+                logger.info(f"Streaming {s3_path} into pgstac")
+                proc = await start_items_load("/dev/stdin", stdin=asyncio.subprocess.PIPE)
+                active_processes[job_id].append(proc)
+                count, output = await stream_file_to_process(bucket, key, proc)
+                if proc.returncode != 0:
+                    raise Exception(f"PGStac failed: {output.decode().strip()}")
+            else:
+                # Staged files go to a long-lived worker, which starts pypgstac
+                # once instead of once per file
+                logger.info(f"Downloading {s3_path} to {tmp_path}")
+                count = await download_file(bucket, key, tmp_path, metadata["size_bytes"])
+                await pgstac_workers.load_items(str(tmp_path), job_id)
+        record_loaded(count)
 
     except asyncio.CancelledError:
-        tracker.update_job(
-            job_id,
-            lambda data: {
-                **data,
-                "summary": {
-                    **data["summary"],
-                    "processed": data["summary"]["processed"] + 1,
-                    "failed": data["summary"]["failed"] + 1,
-                },
-                "details": {
-                    **data["details"],
-                    s3_path: {
-                        "status": "cancelled",
-                        "error": "Processing cancelled",
-                        "completed_at": datetime.now().isoformat(),
-                    },
-                },
-            },
-        )
+        # An in-process load that finished anyway was already recorded
+        if not loaded:
+            tracker.update_job(
+                job_id, mark_file_failed(s3_path, "cancelled", "Processing cancelled")
+            )
+            tracker.update_job_counter(job_id, processed=1, failed=1)
         raise
     except Exception as e:
         logger.error(f"File processing failed: {str(e)}", exc_info=True)
-        tracker.update_job(
-            job_id,
-            lambda data: {
-                **data,
-                "summary": {
-                    **data["summary"],
-                    "processed": data["summary"]["processed"] + 1,
-                    "failed": data["summary"]["failed"] + 1,
-                },
-                "details": {
-                    **data["details"],
-                    s3_path: {
-                        "status": "failed",
-                        "error": str(e),
-                        "completed_at": datetime.now().isoformat(),
-                    },
-                },
-            },
-        )
+        tracker.update_job(job_id, mark_file_failed(s3_path, "failed", str(e)))
+        tracker.update_job_counter(job_id, processed=1, failed=1)
     finally:
         if proc:
-            async with process_lock:
-                try:
-                    active_processes[job_id].remove(proc)
-                except ValueError:
-                    pass
+            # No lock needed, the event loop never switches inside these calls.
+            # Use get() so a job cancel_job already popped isn't re-created.
+            processes = active_processes.get(job_id)
+            if processes and proc in processes:
+                processes.remove(proc)
+                if not processes:
+                    del active_processes[job_id]
         if tmp_path.exists():
             logger.info(f"Cleaning up temporary file {tmp_path}")
             tmp_path.unlink()
 
 
-def download_file(bucket, key, target_path):
-    """Optimized file download with better chunking"""
+async def start_items_load(source, **kwargs):
+    """Start a `pypgstac load items` subprocess reading from source"""
+    return await asyncio.create_subprocess_exec(
+        *_PYPGSTAC,
+        "load",
+        "items",
+        source,
+        "--method=insert_ignore",
+        _DSN_ARG,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        **kwargs,
+    )
+
+
+class PgstacLoaderPool:
+    """In-process pypgstac loaders, one per concurrent file slot
+
+    Each slot owns its own PgstacDB connection because loaders run in worker
+    threads and a connection must not be shared between them.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = None
+
+    def _connect(self):
+        db = PgstacDB(dsn=DATABASE_URL)
+        return db, Loader(db=db)
+
+    async def load_items(self, source, on_loaded=None):
+        """Load NDJSON with insert_ignore, raises if pypgstac fails
+
+        source is a file path or an iterable of lines, such as S3LineStream.
+        A load can't be interrupted, if the caller is cancelled it runs to the
+        end and, when it succeeded, on_loaded is called before the
+        cancellation propagates.
+        """
+        if self._idle is None:
+            # Connections are opened lazily, a None slot means "connect first"
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+
+        slot = await self._idle.get()
+        try:
+            if slot is None:
+                slot = await asyncio.to_thread(self._connect)
+            load = asyncio.ensure_future(
+                asyncio.to_thread(
+                    slot[1].load_items, source, insert_mode=Methods.insert_ignore
+                )
+            )
+            await asyncio.shield(load)
+        except asyncio.CancelledError:
+            if slot is not None:
+                # Wait for the thread to be done with the connection, then
+                # close it rather than leaking it
+                await asyncio.wait({load})
+                error = load.exception()
+                if error is None:
+                    if on_loaded is not None:
+                        on_loaded()
+                else:
+                    logger.error(f"PGStac failed during cancellation: {str(error)}")
+                await asyncio.to_thread(slot[0].close)
+                slot = None
+            raise
+        except Exception as e:
+            if slot is not None and isinstance(
+                e, (psycopg.OperationalError, psycopg.InterfaceError)
+            ):
+                # Only a broken connection is dropped, bad items leave it usable
+                await asyncio.to_thread(slot[0].close)
+                slot = None
+            raise Exception(f"PGStac failed: {str(e)}") from e
+        finally:
+            self._idle.put_nowait(slot)
+
+    def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            if slot is not None:
+                slot[0].close()
+        self._idle = None
+
+
+pgstac_loaders = PgstacLoaderPool(MAX_CONCURRENT_FILES)
+
+
+class PgstacWorkerPool:
+    """Long-lived pypgstac loader processes, one per concurrent file slot
+
+    Each worker runs pgstac_worker.py, which imports pypgstac and connects to
+    the database once and then loads one file path per request line. Unlike an
+    in-process load, a worker can be killed by the cancel endpoint.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = None
+
+    async def _spawn(self):
+        return await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(PGSTAC_WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, "DATABASE_URL": DATABASE_URL or ""},
+        )
+
+    async def load_items(self, path, job_id):
+        """Load an NDJSON file through an idle worker, raises if pypgstac fails"""
+        if self._idle is None:
+            # Workers are spawned lazily, a None slot means "start one"
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+
+        worker = await self._idle.get()
+        registered = None
+        try:
+            if worker is None or worker.returncode is not None:
+                worker = await self._spawn()
+            active_processes[job_id].append(worker)
+            registered = worker
+
+            worker.stdin.write(f"{path}\n".encode())
+            await worker.stdin.drain()
+            line = await worker.stdout.readline()
+            if not line:
+                raise Exception("pgstac worker exited unexpectedly")
+            response = json.loads(line)
+        except BaseException:
+            # The worker may be mid-load, replace it rather than reuse it
+            if worker is not None and worker.returncode is None:
+                worker.kill()
+            worker = None
+            raise
+        finally:
+            if registered is not None:
+                # cancel_job may already have popped the job's processes
+                processes = active_processes.get(job_id)
+                if processes and registered in processes:
+                    processes.remove(registered)
+                    if not processes:
+                        del active_processes[job_id]
+            self._idle.put_nowait(worker)
+
+        if not response["ok"]:
+            raise Exception(f"PGStac failed: {response['error']}")
+
+    async def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None and worker.returncode is None:
+                worker.stdin.close()
+                await worker.wait()
+        self._idle = None
+
+
+pgstac_workers = PgstacWorkerPool(MAX_CONCURRENT_FILES)
+
+
+async def get_async_s3():
+    """Shared async S3 client, opened on first use and kept for the process lifetime"""
+    global async_s3
+    async with async_s3_lock:
+        if async_s3 is None:
+            async_s3 = await async_s3_stack.enter_async_context(
+                async_s3_session.client(
+                    "s3",
+                    config=Config(
+                        signature_version=UNSIGNED,
+                        max_pool_connections=MAX_CONCURRENT_FILES * 2,
+                    ),
+                )
+            )
+    return async_s3
+
+
+async def close_async_s3():
+    global async_s3
+    await async_s3_stack.aclose()
+    async_s3 = None
+
+
+async def download_file(bucket, key, target_path, size_bytes=None):
+    """Stream a file from S3 to disk, returns the number of lines written"""
+    if size_bytes is not None and size_bytes >= TRANSFER_CONFIG.multipart_threshold:
+        return await asyncio.to_thread(download_file_ranged, bucket, key, target_path)
+
+    client = await get_async_s3()
+    response = await client.get_object(Bucket=bucket, Key=key)
+    chunk_size = 10 * 1024 * 1024  # 10MB chunks
+    line_count = 0
+
+    async with response["Body"] as body, aiofiles.open(target_path, "wb") as f:
+        async for chunk in body.iter_chunks(chunk_size):
+            # Count while streaming, so the file isn't read back just for `wc -l`
+            line_count += chunk.count(b"\n")
+            await f.write(chunk)
+    return line_count
+
+
+class LineCountingWriter:
+    """File wrapper counting newlines as parts are written, in any order"""
+
+    def __init__(self, f):
+        self._f = f
+        self.line_count = 0
+
+    def write(self, data):
+        self.line_count += data.count(b"\n")
+        return self._f.write(data)
+
+    def seek(self, *args):
+        return self._f.seek(*args)
+
+    def tell(self):
+        return self._f.tell()
+
+
+def download_file_ranged(bucket, key, target_path):
+    """Download a large file with parallel ranged GETs, returns the number of lines"""
     with open(target_path, "wb") as f:
-        response = s3.get_object(Bucket=bucket, Key=key)
-        chunk_size = 10 * 1024 * 1024  # 10MB chunks
-        body = response["Body"]
+        writer = LineCountingWriter(f)
+        s3.download_fileobj(bucket, key, writer, Config=TRANSFER_CONFIG)
+    return writer.line_count
 
-        while True:
-            chunk = body.read(chunk_size)
-            if not chunk:
-                break
-            f.write(chunk)
 
+class S3LineStream:
+    """Iterate over the non-empty lines of an S3 object, counting them
 
-def check_existing_ingest(job_id, bucket, key, size_mb, etag):
-    """Check if file was already successfully ingested in previous jobs"""
-    s3_path = f"s3://{bucket}/{key}"
+    Blocking, meant to be consumed by the in-process loader's worker thread.
+    """
+
+    def __init__(self, bucket, key, chunk_size=1024 * 1024):
+        self.bucket = bucket
+        self.key = key
+        self.chunk_size = chunk_size
+        self.count = 0
+
+    def __iter__(self):
+        body = s3.get_object(Bucket=self.bucket, Key=self.key)["Body"]
+        try:
+            for line in body.iter_lines(chunk_size=self.chunk_size):
+                if line.strip():
+                    self.count += 1
+                    yield line
+        finally:
+            body.close()
+
+
+async def stream_file_to_process(bucket, key, proc):
+    """Pipe a file from S3 into proc's stdin, returns (line_count, output)"""
+    client = await get_async_s3()
+    response = await client.get_object(Bucket=bucket, Key=key)
+    chunk_size = 10 * 1024 * 1024  # 10MB chunks
+    line_count = 0
 
-    for past_job_id in tracker.list_jobs():
-        if past_job_id == job_id:
-            continue
-        past_job = tracker.get_job(past_job_id, details=True)
-        if not past_job:
-            continue
-        file_entry = past_job.get("details", {}).get(s3_path)
-        if file_entry and file_entry["status"] == "success":
-            if file_entry["size_mb"] == size_mb and file_entry["etag"] == etag:
-                return True
-    return False
+    # Drain the output pipe while writing so a chatty loader can't deadlock us
+    output_task = asyncio.create_task(proc.stdout.read())
+    try:
+        async with response["Body"] as body:
+            async for chunk in body.iter_chunks(chunk_size):
+                line_count += chunk.count(b"\n")
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # The loader exited early, its output and return code tell why
+        pass
+    except BaseException:
+        proc.kill()
+        output_task.cancel()
+        raise
+    finally:
+        proc.stdin.close()
+
+    output = await output_task
+    await proc.wait()
+    return line_count, output
 
 
 async def dummy_subtask(job_id: str, index: int, total: int):
@@ -635,36 +966,19 @@ async def dummy_subtask(job_id: str, index: int, total: int):
     sleep_time = random.randint(10, 30)
     await asyncio.sleep(sleep_time)  # Simulate work
 
-    # Update summary with incremented counters and recalculated progress
-    tracker.update_job(
-        job_id,
-        lambda data: {
-            **data,
-            "summary": {
-                **data["summary"],
-                "processed": data["summary"].get("processed", 0) + 1,
-                "succeeded": data["summary"].get("succeeded", 0) + 1,
-                "progress": data["summary"].get("processed", 0) / total * 100,
-                "total_files": total,
-            },
-        },
-    )
+    def record_subtask(data):
+        data["summary"]["total_files"] = total
 
-    # Update task-specific details
-    tracker.update_job(
-        job_id,
-        lambda data: {
-            **data,
-            "details": {
-                **data.get("details", {}),
-                f"dummy_task_{index}": {
-                    "status": "completed",
-                    "message": f"Dummy task {index} completed",
-                    "completed_at": datetime.now().isoformat(),
-                },
-            },
-        },
-    )
+        # Update task-specific details
+        data.setdefault("details", {})[f"dummy_task_{index}"] = {
+            "status": "completed",
+            "message": f"Dummy task {index} completed",
+            "completed_at": datetime.now().isoformat(),
+        }
+
+    tracker.update_job(job_id, record_subtask)
+    # Counters are coalesced, progress follows from processed and total_files
+    tracker.update_job_counter(job_id, processed=1, succeeded=1)
 
 
 async def dummy_task(job_id: str, name: str, tasks_to_run: int, concurrent_tasks: int):
@@ -672,101 +986,136 @@ async def dummy_task(job_id: str, name: str, tasks_to_run: int, concurrent_tasks
         # Initial job setup
         tracker.update_job(
             job_id,
-            lambda data: {
-                "summary": {
+            lambda data: data["summary"].update(
+                {
                     "total_files": tasks_to_run,
                     "progress": 0.0,
                     "succeeded": 0,
                     "name": name,
-                },
-                **data,
-            },
+                }
+            ),
         )
         logger.info(f"Starting dummy task {name} with {tasks_to_run} tasks")
 
-        # Process tasks in batches
+        # Run up to concurrent_tasks subtasks at a time, no waiting on batches
         if concurrent_tasks > MAX_CONCURRENT_FILES:
             concurrent_tasks = MAX_CONCURRENT_FILES
             logger.warning(f"Concurrent tasks limited to {MAX_CONCURRENT_FILES}")
-        for batch_start in range(0, tasks_to_run, concurrent_tasks):
-            job = tracker.get_job(job_id)
-            logger.info(f"Processing batch for job {job_id}")
-            if job and job.get("status") == "cancelled":
-                tracker.update_job(
-                    job_id,
-                    lambda data: data.update(
-                        {
-                            **data,
-                            "status": "cancelled",
-                            "error": "Job was cancelled during processing",
-                        }
-                    ),
-                )
-                break
+        semaphore = asyncio.Semaphore(concurrent_tasks)
 
-            logger.info(f"Batch start: {batch_start}, Job status: {job.get('status')}")
-            batch_end = min(batch_start + concurrent_tasks, tasks_to_run)
-            batch_tasks = [
-                dummy_subtask(job_id, index, tasks_to_run)
-                for index in range(batch_start, batch_end)
-            ]
-            await asyncio.gather(*batch_tasks)
+        async def run_subtask(index):
+            async with semaphore:
+                await dummy_subtask(job_id, index, tasks_to_run)
 
-        # Final completion check
-        if tracker.get_job(job_id).get("status") != "cancelled":
+        tasks = [asyncio.create_task(run_subtask(i)) for i in range(tasks_to_run)]
+        watcher = asyncio.create_task(watch_for_cancellation(job_id, tasks))
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            watcher.cancel()
+
+        if tracker.get_job(job_id).get("status") == "cancelled":
             tracker.update_job(
                 job_id,
-                lambda data: {
-                    **data,
-                    "status": "completed",
-                    "summary": {
-                        **data["summary"],
-                        "progress": 100.0,
-                        "processed": tasks_to_run,
-                    },
-                },
+                set_job_fields(
+                    status="cancelled", error="Job was cancelled during processing"
+                ),
             )
 
+        # Final completion check
+        if tracker.get_job(job_id).get("status") != "cancelled":
+
+            def mark_completed(data):
+                data["status"] = "completed"
+                data["summary"].update({"progress": 100.0, "processed": tasks_to_run})
+
+            tracker.update_job(job_id, mark_completed)
+
     except asyncio.CancelledError:
-        # tracker.update_job(job_id, {"status": "cancelled"})
         tracker.update_job(
             job_id,
-            lambda data: data.update(
-                {
-                    **data,
-                    "status": "cancelled",
-                    "error": "Job was cancelled during processing",
-                }
+            set_job_fields(
+                status="cancelled", error="Job was cancelled during processing"
             ),
         )
     except Exception as e:
-        tracker.update_job(job_id, {"status": "failed", "error": str(e)})
+        tracker.update_job(job_id, set_job_fields(status="failed", error=str(e)))
 
 
 def discover_files(bucket: str, path: str, recursive: bool, year: int = None, collection_id: str = None) -> list:
     """Discover STAC files with configurable patterns per collection"""
-    from collection_config import get_filename_regex_for_collection, get_file_pattern_for_collection
+    from collection_config import (
+        get_filename_regex_for_collection,
+        get_file_pattern_for_collection,
+        has_yearly_files_only,
+    )
     
     prefix = path.rstrip("/") + "/"
-    files = []
 
     # Default to .ndjson files if no collection specified
     file_pattern = "*.ndjson"
     filename_regex = None
+    yearly_files_only = False
     
     if collection_id:
         file_pattern = get_file_pattern_for_collection(collection_id) or file_pattern
         filename_regex = get_filename_regex_for_collection(collection_id)
-    
+        yearly_files_only = has_yearly_files_only(collection_id)
+
+    # A single year in a single folder of yearly files is one known key, no
+    # listing needed. Elsewhere files with non-year names are kept, so list.
+    if year and not recursive and yearly_files_only:
+        return find_year_file(bucket, prefix, year, filename_regex)
+
+    files, sub_prefixes = list_matching_files(bucket, prefix, "/", year, filename_regex)
+
+    # List sub folders in parallel instead of paginating the whole tree serially
+    if recursive and sub_prefixes:
+        with ThreadPoolExecutor(max_workers=min(len(sub_prefixes), DISCOVERY_WORKERS)) as pool:
+            for sub_files, _ in pool.map(
+                lambda sub_prefix: list_matching_files(bucket, sub_prefix, "", year, filename_regex),
+                sub_prefixes,
+            ):
+                files.extend(sub_files)
+
+    return files
+
+
+def find_year_file(bucket: str, prefix: str, year: int, filename_regex=None) -> list:
+    """Return the yearly NDJSON file directly under prefix if it exists"""
+    filename = f"{year:04d}"
+    if filename_regex and not filename_regex.match(filename):
+        return []
+
+    key = f"{prefix}{filename}.ndjson"
+    try:
+        s3.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return []
+        raise
+    return [(bucket, key)]
+
+
+def list_matching_files(bucket: str, prefix: str, delimiter: str, year: int = None, filename_regex=None):
+    """List NDJSON files under prefix, returns (files, common_prefixes)"""
+    files = []
+    common_prefixes = []
+    year_name = f"{year:04d}" if year else None
+
+    # No StartAfter for the year: files with non-year names are kept whatever the
+    # year, and sub folders sorting before it are still needed for recursion.
+    # Only collections with yearly files alone pin a single key, see find_year_file.
     paginator = s3.get_paginator("list_objects_v2")
     operation_params = {
         "Bucket": bucket,
         "Prefix": prefix,
-        "Delimiter": "/" if not recursive else "",
+        "Delimiter": delimiter,
         "MaxKeys": 1000,  # Max allowed by S3
     }
 
     for page in paginator.paginate(**operation_params):
+        common_prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
         for obj in page.get("Contents", []):
             key = obj["Key"]
             
@@ -781,14 +1130,12 @@ def discover_files(bucket: str, path: str, recursive: bool, year: int = None, co
                 continue
             
             # Legacy year filtering for backward compatibility
-            if filename.isdigit() and len(filename) == 4:
-                file_year = int(filename)
-                if year and file_year != year:
-                    continue
+            if year_name and filename != year_name and filename.isdigit() and len(filename) == 4:
+                continue
 
             files.append((bucket, key))
 
-    return files
+    return files, common_prefixes
 
 
 async def process_granules_from_url(job_id: str, url: str):
@@ -798,7 +1145,7 @@ async def process_granules_from_url(job_id: str, url: str):
     import json
     
     try:
-        tracker.update_job(job_id, {"status": "running"})
+        tracker.update_job(job_id, set_job_fields(status="running"))
         logger.info(f"Processing granules from URL: {url}")
         
         # Fetch granule data from URL
@@ -817,37 +1164,37 @@ async def process_granules_from_url(job_id: str, url: str):
         try:
             # Load granules into database using pypgstac
             proc = await asyncio.create_subprocess_exec(
-                "micromamba", "run", "-p", "/opt/conda", "pypgstac",
+                *_PYPGSTAC,
                 "load",
                 "items",
                 temp_file_path,
                 "--method=insert_ignore",
-                f"--dsn={DATABASE_URL}",
+                _DSN_ARG,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
             )
 
-            stdout, stderr = await proc.communicate()
+            output, _ = await proc.communicate()
             
             if proc.returncode != 0:
-                raise Exception(f"Failed to load granules: {stderr.decode().strip()}")
+                raise Exception(f"Failed to load granules: {output.decode().strip()}")
             
             # Count processed items
             item_count = granule_data.count('\n') if granule_data else 0
             
             tracker.update_job(
                 job_id,
-                {
-                    "status": "completed",
-                    "summary": {
+                set_job_fields(
+                    status="completed",
+                    summary={
                         "total_files": 1,
                         "processed": 1,
                         "succeeded": 1,
                         "failed": 0,
                         "progress": 100.0,
                         "items_processed": item_count,
-                    }
-                }
+                    },
+                ),
             )
             
             logger.info(f"Successfully processed {item_count} granules from {url}")
@@ -858,4 +1205,4 @@ async def process_granules_from_url(job_id: str, url: str):
             
     except Exception as e:
         logger.error(f"Failed to process granules from {url}: {str(e)}")
-        tracker.update_job(job_id, {"status": "failed", "error": str(e)})
+        tracker.update_job(job_id, set_job_fields(status="failed", error=str(e)))
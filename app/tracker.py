@@ -1,12 +1,20 @@
-import json
+import asyncio
+import copy
+import functools
+import heapq
 import uuid
 import threading
+from contextlib import contextmanager
 import time
 import os
 from datetime import datetime
+from operator import itemgetter
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import boto3
+import orjson
+from cachetools import TTLCache
 from botocore import UNSIGNED
 from botocore.config import Config
 import logging
@@ -15,40 +23,311 @@ logger = logging.getLogger(__name__)
 
 
 STATE_DIR = os.getenv("STATE_DIRECTORY", "./state")
+CACHE_TTL = 3600  # 1 hour
+JOB_LOCK_STRIPES = 256  # power of two, _get_job_lock masks the hash
+FLUSH_INTERVAL = 0.5  # seconds between write-behind flushes of job state
+COUNTER_INTERVAL = 0.2  # seconds between applying pending summary counter deltas
+INDEX_REFRESH_INTERVAL = 10  # seconds, how often listings re-check the job files
+METADATA_WORKERS = 50  # concurrent HEAD requests, matches max_pool_connections
+# Updates into these statuses are written through, everything else is batched
+DURABLE_STATUSES = ("completed", "failed", "cancelled")
+
+try:
+    import ijson
+except ImportError:  # falls back to parsing whole files
+    ijson = None
+
+# Top-level job fields the index needs, all written before the large "details"
+INDEX_FIELDS = frozenset({"job_id", "parameters", "status", "created_at", "updated_at"})
+
+# Each job is stored as a small header (everything but "details") and a separate
+# details file, so status and summary reads don't parse the per-file entries.
+# Older jobs are a single {job_id}.json, migrated on their next write.
+HEADER_SUFFIX = ".header.json"
+DETAILS_SUFFIX = ".details.json"
+
+
+@functools.lru_cache(maxsize=None)
+def get_s3_client():
+    """One anonymous S3 client per process, created on first use.
+
+    boto3 clients are thread-safe, so every JobTracker shares this one and its
+    connection pool instead of paying for a client each.
+    """
+    return boto3.client(
+        "s3", config=Config(signature_version=UNSIGNED, max_pool_connections=50)
+    )
+
+
+def read_job_file(path):
+    """Parse a job file, orjson works on bytes so read it in binary"""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def read_job_fields(path, fields):
+    """Parse only the given top-level fields of a job file.
+
+    Header files are small, orjson parses them whole faster than ijson can
+    walk them. For legacy single-file jobs ijson stops as soon as all fields
+    were seen, so their "details" dict, which comes after them, is never parsed.
+    """
+    if ijson is None or path.name.endswith(HEADER_SUFFIX):
+        data = read_job_file(path)
+        return {field: data[field] for field in fields if field in data}
+
+    found = {}
+    with open(path, "rb") as f:
+        for field, value in ijson.kvitems(f, "", use_float=True):
+            if field in fields:
+                found[field] = value
+                if len(found) == len(fields):
+                    break
+    return found
+
+
+def write_job_file(path, data):
+    """Serialize data to a job file, compact, `python -m json.tool` pretty-prints one"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data))
+
+
+def replace_job_file(path, data):
+    """Write data next to path, then atomically rename it over path"""
+    temp_file = path.with_suffix(".tmp")
+    try:
+        write_job_file(temp_file, data)
+        temp_file.replace(path)
+    except Exception:
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+
+
+class RWLock:
+    """Reader/writer lock, many readers or one writer, not reentrant.
+
+    A waiting writer holds off new readers, so a steady stream of listings
+    can't starve the writes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
 
 
 class JobTracker:
     def __init__(self, jobs_dir=f"{STATE_DIR}/jobs"):
         self.jobs_dir = Path(jobs_dir)
         self.jobs_dir.mkdir(parents=True, exist_ok=True)
-        self.s3 = boto3.client(
-            "s3", config=Config(signature_version=UNSIGNED, max_pool_connections=50)
+        # In-memory cache for metadata, bounded and expiring entries on access.
+        # TTLCache isn't thread-safe and even a lookup may evict, so it has its
+        # own plain lock rather than the global read lock.
+        self.CACHE_TTL = CACHE_TTL
+        self.metadata_cache = TTLCache(maxsize=100_000, ttl=self.CACHE_TTL)
+        self.metadata_lock = threading.Lock()
+
+        # Locks for thread safety - job level and global. Job locks are a fixed
+        # set of stripes, so memory doesn't grow with the number of jobs. The
+        # global lock is a reader/writer lock so listings and cache lookups run
+        # in parallel; it is not reentrant. Lock order: a job lock, then the
+        # global lock, never the other way around.
+        self._stripes = [threading.RLock() for _ in range(JOB_LOCK_STRIPES)]
+        self.global_lock = RWLock()
+
+        # s3_path -> {"size_mb", "etag"} of successfully ingested files, built lazily
+        self._success_index = None
+
+        # job_id -> latest state not yet on disk, guarded by the job's lock
+        self._dirty = {}
+        # Jobs whose details changed since their details file was last written
+        self._details_dirty = set()
+        # job_id -> {summary counter: delta} not yet applied, see update_job_counter
+        self._pending_counters = defaultdict(lambda: defaultdict(int))
+        self._counters_lock = threading.Lock()
+
+        # job_id -> listing fields, so listing and counting don't re-read every
+        # file, and job_id -> (mtime_ns, size) of the file each entry came from
+        self._index = {}
+        self._file_stats = {}
+        self._index_refreshed_at = 0.0
+        self.refresh_index()
+
+        self._stop_flusher = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="job-flusher", daemon=True
         )
-        # In-memory cache for metadata
-        self.metadata_cache = {}
-        self.cache_expiry = {}
-        self.CACHE_TTL = 3600  # 1 hour
+        self._flusher.start()
+
+    @property
+    def s3(self):
+        return get_s3_client()
+
+    @staticmethod
+    def _index_entry(job_id, data):
+        """The fields list_jobs returns, taken from a job's full state"""
+        return {
+            "job_id": data.get("job_id", job_id),
+            "created_at": data["created_at"],
+            "updated_at": data["updated_at"],
+            "status": data["status"],
+            "bucket": data["parameters"].get("bucket"),
+            "path": data["parameters"].get("path"),
+        }
 
-        # Locks for thread safety - job level and global
-        self.job_locks = {}
-        self.global_lock = threading.RLock()  # Reentrant lock
+    def _scan_job_files(self):
+        """(job_id, DirEntry) of every job's header, from a single directory read.
+
+        Legacy single-file jobs are returned as their own header.
+        """
+        headers = {}
+        legacy = {}
+        with os.scandir(self.jobs_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".json") or name.endswith(DETAILS_SUFFIX):
+                    continue
+                if not entry.is_file():
+                    continue
+                if name.endswith(HEADER_SUFFIX):
+                    headers[name[: -len(HEADER_SUFFIX)]] = entry
+                else:
+                    legacy[name[: -len(".json")]] = entry
+        # A header wins over a legacy file left behind by an interrupted migration
+        for job_id, entry in legacy.items():
+            headers.setdefault(job_id, entry)
+        return list(headers.items())
+
+    def _job_paths(self, job_id):
+        """(header, details, legacy single-file) paths of a job"""
+        return (
+            self.jobs_dir / f"{job_id}{HEADER_SUFFIX}",
+            self.jobs_dir / f"{job_id}{DETAILS_SUFFIX}",
+            self.jobs_dir / f"{job_id}.json",
+        )
+
+    def _read_job(self, job_id, details=True):
+        """A job's state from disk, None if it doesn't exist. Caller holds the job lock"""
+        header_file, details_file, legacy_file = self._job_paths(job_id)
+        if header_file.exists():
+            data = read_job_file(header_file)
+            if details:
+                data["details"] = (
+                    read_job_file(details_file) if details_file.exists() else {}
+                )
+            return data
+        if legacy_file.exists():
+            data = read_job_file(legacy_file)
+            if not details:
+                data.pop("details", None)
+            return data
+        return None
+
+    def refresh_index(self):
+        """Bring the index in line with the job files on disk.
+
+        A file whose mtime and size match what was last read keeps its parsed
+        entry, so only new or changed files are parsed again.
+        """
+        self._index_refreshed_at = time.monotonic()
+        with self.global_lock.read():
+            known = dict(self._file_stats)
+
+        changed = {}
+        on_disk = set()
+        for job_id, entry in self._scan_job_files():
+            on_disk.add(job_id)
+            try:
+                stat = entry.stat()
+                file_stat = (stat.st_mtime_ns, stat.st_size)
+                if known.get(job_id) == file_stat:
+                    continue
+                data = read_job_fields(Path(entry.path), INDEX_FIELDS)
+                changed[job_id] = (file_stat, self._index_entry(job_id, data))
+            except Exception as e:
+                # Skip corrupt job files
+                logger.error(f"Error reading job file {entry.path}: {str(e)}")
+
+        with self.global_lock.write():
+            updated = False
+            for job_id, (file_stat, index_entry) in changed.items():
+                # Anything this process wrote since the scan started is newer
+                if job_id in self._dirty or self._file_stats.get(job_id) != known.get(job_id):
+                    continue
+                self._file_stats[job_id] = file_stat
+                self._index[job_id] = index_entry
+                updated = True
+            for job_id in known.keys() - on_disk:
+                if job_id not in self._dirty and self._file_stats.get(job_id) == known[job_id]:
+                    self._file_stats.pop(job_id, None)
+                    self._index.pop(job_id, None)
+                    updated = True
+            if updated:
+                # Jobs written or removed elsewhere, rebuild the success index
+                # on its next use
+                self._success_index = None
+
+    def _index_refresh_due(self):
+        return time.monotonic() - self._index_refreshed_at >= INDEX_REFRESH_INTERVAL
+
+    def _maybe_refresh_index(self):
+        if self._index_refresh_due():
+            self.refresh_index()
+
+    def _record_file_stat(self, job_id, job_file):
+        """Remember the stat of a file this process wrote, caller holds the global write lock"""
+        stat = os.stat(job_file)
+        self._file_stats[job_id] = (stat.st_mtime_ns, stat.st_size)
 
     def _get_job_lock(self, job_id):
-        """Get a lock for a specific job, creating it if it doesn't exist"""
-        logger.debug(f"Getting lock for job {job_id}")
+        """Get the lock stripe for a specific job.
+
+        Two jobs can share a stripe, that only costs some contention since the
+        critical sections are short file reads and writes.
+        """
         if not isinstance(job_id, str):
             # Convert to string or raise an error
             job_id = str(job_id)  # or job_id["job_id"] if it's expected to be a dict
 
-        with self.global_lock:
-            if job_id not in self.job_locks:
-                self.job_locks[job_id] = threading.RLock()
-            return self.job_locks[job_id]
+        return self._stripes[hash(job_id) & (JOB_LOCK_STRIPES - 1)]
 
     def create_job(self, bucket, path, recursive, year=None, collection_id=None):
         """Create a new job with thread safety"""
         job_id = str(uuid.uuid4())
-        job_file = self.jobs_dir / f"{job_id}.json"
+        now = datetime.now().isoformat()
 
         initial_state = {
             "job_id": job_id,
@@ -60,8 +339,8 @@ class JobTracker:
                 "collection_id": collection_id,
             },
             "status": "pending",
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "summary": {
                 "total_files": 0,
                 "processed": 0,
@@ -77,49 +356,82 @@ class JobTracker:
         job_lock = self._get_job_lock(job_id)
 
         with job_lock:
-            with open(job_file, "w") as f:
-                json.dump(initial_state, f, indent=2)
+            self._write_job(job_id, initial_state)
+            with self.global_lock.write():
+                self._index[job_id] = self._index_entry(job_id, initial_state)
 
         return job_id
 
     def has_active_jobs(self):
-        """Check if there are any active jobs with thread safety"""
-        with self.global_lock:
-            for job_data in self.list_jobs():
-                job_id = job_data["job_id"]
-                logger.debug(f"Job ID: {job_id}, Status: {job_data['status']}")
-                if job_data and job_data.get("status") in ["pending", "processing"]:
-                    return job_data
+        """Return the listing entry of an active job, or False if there is none"""
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            for job in self._index.values():
+                if job["status"] in ("pending", "processing"):
+                    return dict(job)
         return False
 
     def get_jobs_by_status(self, status):
         """Get all jobs with a specific status, with thread safety"""
-        jobs = []
-
-        # First get all job IDs under global lock
-        with self.global_lock:
-            job_ids = self.list_jobs()
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            job_ids = [
+                job_id for job_id, job in self._index.items() if job["status"] == status
+            ]
 
+        jobs = []
         for job_id in job_ids:
             job_data = self.get_job(job_id)
+            # The status may have moved on since the index was read
             if job_data and job_data.get("status") == status:
                 jobs.append(job_data)
         return jobs
 
-    def update_job(self, job_id, update_fn):
+    def _write_job(self, job_id, data):
+        """Atomically replace a job's header file, and its details file if they
+        changed since the last write. Caller holds the job lock"""
+        header_file, details_file, legacy_file = self._job_paths(job_id)
+        header = {key: value for key, value in data.items() if key != "details"}
+
+        # Details first, a header on disk always has its details next to it
+        if job_id in self._details_dirty or not details_file.exists():
+            replace_job_file(details_file, data.get("details", {}))
+            self._details_dirty.discard(job_id)
+        replace_job_file(header_file, header)
+        if legacy_file.exists():
+            legacy_file.unlink()
+
+        with self.global_lock.write():
+            self._record_file_stat(job_id, header_file)
+
+    def update_job(self, job_id, update_fn, details=True):
+        """Apply update_fn to a job's state.
+
+        Progress updates only change the in-memory copy, the flusher thread
+        writes it out within FLUSH_INTERVAL. Moving to a DURABLE_STATUSES
+        status writes the file before returning. details=False promises that
+        update_fn leaves data["details"] alone, so only the header is rewritten.
+        """
         logger.debug(f"Updating job {job_id}")
-        job_file = self.jobs_dir / f"{job_id}.json"
-        temp_file = job_file.with_suffix(".tmp")
 
         job_lock = self._get_job_lock(job_id)
         with job_lock:
-            if not job_file.exists():
-                logger.warning(f"Attempted to update non-existent job {job_id}")
-                return False
-
             try:
-                with open(job_file, "r") as f:
-                    data = json.load(f)
+                data = self._dirty.get(job_id)
+                if data is None:
+                    data = self._read_job(job_id)
+                if data is None:
+                    # Counters of a missing or deleted job would be retried forever
+                    self._take_counters(job_id)
+                    logger.warning(f"Attempted to update non-existent job {job_id}")
+                    return False
+
+                # Pending counter deltas go first, so update_fn sees them and
+                # can't be undone by them landing after an overwrite
+                deltas = self._take_counters(job_id)
+                if deltas:
+                    self._apply_counters(data, deltas)
+                    self._dirty[job_id] = data
 
                 # Apply the update function
                 result = update_fn(data)
@@ -127,33 +439,103 @@ class JobTracker:
                 # If the update function returns a dict, replace data with it
                 if isinstance(result, dict):
                     data = result
+                if details or isinstance(result, dict):
+                    self._details_dirty.add(job_id)
 
                 data["updated_at"] = datetime.now().isoformat()
 
-                with open(temp_file, "w") as f:
-                    json.dump(data, f, indent=2)
+                if data.get("status") in DURABLE_STATUSES:
+                    self._write_job(job_id, data)
+                    self._dirty.pop(job_id, None)
+                else:
+                    self._dirty[job_id] = data
 
-                temp_file.replace(job_file)
+                with self.global_lock.write():
+                    self._index[job_id] = self._index_entry(job_id, data)
                 return True
             except Exception as e:
                 logger.error(f"Error updating job {job_id}: {str(e)}")
-                if temp_file.exists():
-                    temp_file.unlink()
                 return False
 
+    def update_job_counter(self, job_id, **deltas):
+        """Add to a job's summary counters, e.g. processed=1, succeeded=1.
+
+        Only the in-memory deltas change here. They are applied together every
+        COUNTER_INTERVAL, or before the job's next update_job, whichever comes
+        first, and written out with the rest of the job on the next flush.
+        """
+        with self._counters_lock:
+            pending = self._pending_counters[job_id]
+            for counter, delta in deltas.items():
+                pending[counter] += delta
+
+    def _take_counters(self, job_id):
+        with self._counters_lock:
+            return self._pending_counters.pop(job_id, None)
+
+    @staticmethod
+    def _apply_counters(data, deltas):
+        summary = data.setdefault("summary", {})
+        for counter, delta in deltas.items():
+            summary[counter] = summary.get(counter, 0) + delta
+        if "processed" in deltas and summary.get("total_files"):
+            summary["progress"] = summary["processed"] / summary["total_files"] * 100
+
+    def apply_counters(self):
+        """Apply every job's pending counter deltas to its in-memory state"""
+        with self._counters_lock:
+            counted = list(self._pending_counters)
+        for job_id in counted:
+            # A no-op update applies the pending deltas and marks the job dirty
+            self.update_job(job_id, lambda data: None, details=False)
+
+    def flush(self):
+        """Write out every job whose latest state is only in memory"""
+        self.apply_counters()
+
+        for job_id in list(self._dirty):
+            with self._get_job_lock(job_id):
+                data = self._dirty.pop(job_id, None)
+                if data is None:
+                    continue
+                try:
+                    self._write_job(job_id, data)
+                except Exception as e:
+                    # Keep it dirty so the next flush retries
+                    self._dirty.setdefault(job_id, data)
+                    logger.error(f"Error flushing job {job_id}: {str(e)}")
+
+    def _flush_loop(self):
+        flushed_at = time.monotonic()
+        while not self._stop_flusher.wait(COUNTER_INTERVAL):
+            if time.monotonic() - flushed_at >= FLUSH_INTERVAL:
+                flushed_at = time.monotonic()
+                self.flush()
+            else:
+                self.apply_counters()
+
+    def close(self):
+        """Stop the flusher thread and write out pending job state"""
+        self._stop_flusher.set()
+        self._flusher.join()
+        self.flush()
+
     def get_job(self, job_id, details=False):
         logger.debug(f"Getting job {job_id}")
-        job_file = self.jobs_dir / f"{job_id}.json"
         job_lock = self._get_job_lock(job_id)
 
         with job_lock:
-            if not job_file.exists():
-                return None
+            data = self._dirty.get(job_id)
 
             try:
-                logger.debug(f"Reading job file {job_file}")
-                with open(job_file, "r") as f:
-                    data = json.load(f)
+                if data is None:
+                    # Without details only the small header file is read
+                    data = self._read_job(job_id, details=details)
+                    if data is None:
+                        return None
+                elif details:
+                    # The in-memory copy keeps changing, hand out a snapshot
+                    data = copy.deepcopy(data)
                 logger.debug(f"Job data: {data}")
 
                 if not details:
@@ -169,7 +551,7 @@ class JobTracker:
                         "updated_at": data["updated_at"]
                         if "updated_at" in data
                         else "unknown",
-                        "summary": data["summary"] if "summary" in data else {},
+                        "summary": dict(data["summary"]) if "summary" in data else {},
                     }
 
                 return data
@@ -178,79 +560,51 @@ class JobTracker:
                 return None
 
     def count_jobs(self, status="all"):
-        job_files = list(self.jobs_dir.glob("*.json"))
-        count = 0
-        for job_file in job_files:
-            try:
-                with open(job_file, "r") as f:
-                    data = json.load(f)
-                # Filter by status
-                if status == "all" or status == data["status"]:
-                    count += 1
-            except Exception:
-                logger.error(f"Error reading job file {job_file}: {str(e)}")
-                continue
-        return count
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            if status == "all":
+                return len(self._index)
+            return sum(1 for job in self._index.values() if job["status"] == status)
 
     def list_jobs(
         self, page_number=0, status="all", sort_by="created_at", sort_order="desc"
     ):
         """List jobs with pagination and sorting options"""
-        with self.global_lock:
-            job_files = list(self.jobs_dir.glob("*.json"))
-            if len(job_files) == 0:
-                return []
-
-            # Basic metadata for sorting
-            jobs_meta = []
-            for job_file in job_files:
-                job_file_id = job_file.stem
-                try:
-                    with open(job_file, "r") as f:
-                        data = json.load(f)
-                    # Filter by status
-                    if status == "all" or status == data["status"]:
-                        jobs_meta.append(
-                            {
-                                "job_id": data["job_id"]
-                                if "job_id" in data
-                                else job_file_id,
-                                "created_at": data["created_at"],
-                                "updated_at": data["updated_at"],
-                                "status": data["status"],
-                                "bucket": data["parameters"].get("bucket"),
-                                "path": data["parameters"].get("path"),
-                            }
-                        )
-                except Exception as e:
-                    # Skip corrupt job files
-                    logger.error(f"Error reading job file {job_file}: {str(e)}")
-                    continue
-
-            # Sort jobs
-            reverse = sort_order.lower() == "desc"
-            sorted_jobs = sorted(
-                jobs_meta, key=lambda x: x.get(sort_by, ""), reverse=reverse
-            )
-
-            # Apply pagination
-            offset = page_number * 10
-            limit = 10
-            if offset >= len(sorted_jobs):
-                return []
-            paginated = sorted_jobs[offset : offset + limit]
-
-            return [job for job in paginated]
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            jobs_meta = [
+                job
+                for job in self._index.values()
+                if status == "all" or status == job["status"]
+            ]
+
+        # Apply pagination
+        offset = page_number * 10
+        limit = 10
+        if offset >= len(jobs_meta):
+            return []
+
+        # Only the rows up to the end of the requested page need ordering.
+        # Every index entry has the same keys, an unknown sort_by keeps index order.
+        if sort_by in jobs_meta[0]:
+            select = heapq.nlargest if sort_order.lower() == "desc" else heapq.nsmallest
+            top = select(offset + limit, jobs_meta, key=itemgetter(sort_by))
+        else:
+            top = jobs_meta[: offset + limit]
+        paginated = top[offset:]
+
+        # Copies, so callers can't modify the index
+        return [dict(job) for job in paginated]
 
     def get_file_metadata(self, bucket, key):
         """Get file metadata with caching"""
         cache_key = f"{bucket}:{key}"
 
-        with self.global_lock:
-            now = time.time()
-            if cache_key in self.metadata_cache:
-                if now - self.cache_expiry.get(cache_key, 0) < self.CACHE_TTL:
-                    return self.metadata_cache[cache_key]
+        with self.metadata_lock:
+            try:
+                return self.metadata_cache[cache_key]
+            except KeyError:
+                pass
 
         try:
             response = self.s3.head_object(Bucket=bucket, Key=key)
@@ -261,65 +615,156 @@ class JobTracker:
             }
 
             # Update cache
-            self.metadata_cache[cache_key] = metadata
-            self.cache_expiry[cache_key] = now
+            with self.metadata_lock:
+                self.metadata_cache[cache_key] = metadata
 
             return metadata
         except Exception as e:
             logger.error(f"Error getting metadata for {bucket}/{key}: {str(e)}")
             raise
 
-    def cancel_job(self, job_id):
-        job_file = self.jobs_dir / f"{job_id}.json"
+    def get_file_metadata_many(self, bucket, keys):
+        """Get metadata for many files, fetching the cache misses concurrently.
+
+        Returns {key: metadata}. Keys whose HEAD request failed are left out,
+        so callers can retry them one at a time and report the error per file.
+        """
+        results = {}
+        misses = []
+        with self.metadata_lock:
+            for key in keys:
+                metadata = self.metadata_cache.get(f"{bucket}:{key}")
+                if metadata is None:
+                    misses.append(key)
+                else:
+                    results[key] = metadata
+
+        if not misses:
+            return results
+
+        def fetch(key):
+            try:
+                return key, self.get_file_metadata(bucket, key)
+            except Exception:
+                # Already logged by get_file_metadata
+                return key, None
+
+        with ThreadPoolExecutor(max_workers=min(len(misses), METADATA_WORKERS)) as pool:
+            for key, metadata in pool.map(fetch, misses):
+                if metadata is not None:
+                    results[key] = metadata
+        return results
+
+    def build_success_index(self):
+        """Index successfully ingested files across all jobs by their S3 path"""
+        with self.global_lock.read():
+            if self._success_index is not None:
+                return self._success_index
+
+        # Scan without holding the lock so listings aren't blocked meanwhile
+        index = {}
+        for job_id, entry in self._scan_job_files():
+            # The job lock keeps an in-memory copy from changing while we walk it
+            with self._get_job_lock(job_id):
+                try:
+                    data = self._dirty.get(job_id) or self._read_job(job_id)
+                except Exception as e:
+                    logger.error(f"Error reading job file {entry.path}: {str(e)}")
+                    continue
+                if data is None:
+                    # Deleted since the directory was scanned
+                    continue
+                for s3_path, file_entry in data.get("details", {}).items():
+                    if (
+                        isinstance(file_entry, dict)
+                        and file_entry.get("status") == "success"
+                    ):
+                        index[s3_path] = {
+                            "size_mb": file_entry.get("size_mb"),
+                            "etag": file_entry.get("etag"),
+                        }
+
+        with self.global_lock.write():
+            # Another thread may have finished first, keep the one in use
+            if self._success_index is None:
+                self._success_index = index
+            return self._success_index
+
+    def record_success(self, s3_path, size_mb, etag):
+        """Keep the success index current after a file is ingested"""
+        with self.global_lock.write():
+            if self._success_index is not None:
+                self._success_index[s3_path] = {"size_mb": size_mb, "etag": etag}
 
-        job_lock = self._get_job_lock(job_id)
-        with job_lock:
-            if not job_file.exists():
-                return False
+    def cancel_job(self, job_id):
+        def mark_cancelled(data):
+            data["status"] = "cancelled"
+            data["cancelled_at"] = datetime.now().isoformat()
 
-            return self.update_job(
-                job_id,
-                lambda data: data.update(
-                    {
-                        **data,
-                        "status": "cancelled",
-                        "cancelled_at": datetime.now().isoformat(),
-                    }
-                ),
-            )
+        # update_job takes the job lock and returns False for unknown jobs
+        return self.update_job(job_id, mark_cancelled, details=False)
 
     def clean_old_jobs(self, days=30):
         """Remove old job files to save disk space"""
-        cutoff = datetime.now().timestamp() - (days * 24 * 60 * 60)
-        with self.global_lock:
-            job_files = list(self.jobs_dir.glob("*.json"))
+        cutoff = datetime.fromtimestamp(
+            datetime.now().timestamp() - (days * 24 * 60 * 60)
+        )
+
+        # First pass, without job locks: status and last update come from the
+        # index, no job file is read
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            jobs = list(self._index.items())
+
+        candidates = []
+        for job_id, job in jobs:
+            if job["status"] not in ["completed", "failed", "cancelled"]:
+                continue
+            try:
+                if datetime.fromisoformat(job["updated_at"]) < cutoff:
+                    candidates.append((job_id, job["updated_at"]))
+            except (TypeError, ValueError):
+                continue
+
+        # Second pass locks only the jobs being deleted
+        for job_id, updated_at in candidates:
+            with self._get_job_lock(job_id):
+                # Skip jobs written to since the first pass
+                with self.global_lock.read():
+                    job = self._index.get(job_id)
+                if job is None or job["updated_at"] != updated_at or job_id in self._dirty:
+                    continue
 
-        for job_file in job_files:
-            job_lock = self._get_job_lock(job_file.stem)
-            with job_lock:
                 try:
-                    # Check file modification time
-                    if job_file.stat().st_mtime < cutoff:
-                        # Check if job is complete or failed before deleting
-                        with open(job_file, "r") as f:
-                            data = json.load(f)
-
-                        if data.get("status") in ["completed", "failed", "cancelled"]:
-                            job_file.unlink()
-                            logger.debug(f"Removed old job file: {job_file.name}")
+                    for path in self._job_paths(job_id):
+                        try:
+                            os.unlink(path)
+                        except FileNotFoundError:
+                            pass
+                    with self.global_lock.write():
+                        self._index.pop(job_id, None)
+                        self._file_stats.pop(job_id, None)
+                        # Its successes shouldn't cause skips any more
+                        self._success_index = None
+                    logger.debug(f"Removed old job files of {job_id}")
                 except Exception as e:
-                    logger.error(f"Error cleaning old job {job_file.name}: {str(e)}")
+                    logger.error(f"Error cleaning old job {job_id}: {str(e)}")
 
     def resume_interrupted_jobs(self):
         """Find and resume jobs that were interrupted, with thread safety"""
         resumed = []
 
-        # Get all job IDs under global lock
-        with self.global_lock:
-            job_ids = self.list_jobs()
+        # Every processing job, not just the first listing page
+        self._maybe_refresh_index()
+        with self.global_lock.read():
+            job_ids = [
+                job_id
+                for job_id, job in self._index.items()
+                if job["status"] == "processing"
+            ]
 
         for job_id in job_ids:
-            job_data = self.get_job(job_id, details=True)
+            job_data = self.get_job(job_id)
             if not job_data:
                 continue
 
@@ -347,7 +792,45 @@ class JobTracker:
 
         return resumed
 
+    # Async API used by the web handlers. The job state lives in files, so the
+    # blocking parts run in a worker thread; callers don't need to know which.
+    async def acreate_job(self, bucket, path, recursive, year=None, collection_id=None):
+        return await asyncio.to_thread(
+            self.create_job, bucket, path, recursive, year, collection_id
+        )
+
+    async def aupdate_job(self, job_id, update_fn):
+        return await asyncio.to_thread(self.update_job, job_id, update_fn)
+
+    async def aget_job(self, job_id, details=False):
+        return await asyncio.to_thread(self.get_job, job_id, details)
+
+    # Listings are answered from the in-memory index, only a due refresh_index
+    # reads the job files and is worth the hop to a worker thread.
+    async def acount_jobs(self, status="all"):
+        if self._index_refresh_due():
+            return await asyncio.to_thread(self.count_jobs, status)
+        return self.count_jobs(status)
+
+    async def alist_jobs(
+        self, page_number=0, status="all", sort_by="created_at", sort_order="desc"
+    ):
+        if self._index_refresh_due():
+            return await asyncio.to_thread(
+                self.list_jobs, page_number, status, sort_by, sort_order
+            )
+        return self.list_jobs(page_number, status, sort_by, sort_order)
+
+    async def ahas_active_jobs(self):
+        if self._index_refresh_due():
+            return await asyncio.to_thread(self.has_active_jobs)
+        return self.has_active_jobs()
+
+    async def acancel_job(self, job_id):
+        return await asyncio.to_thread(self.cancel_job, job_id)
+
 
-metadata_cache = {}
+# Bounded so long-running workers don't grow it forever, and expires stale etags
+metadata_cache = TTLCache(maxsize=100_000, ttl=CACHE_TTL)
 active_processes = defaultdict(list)
 job_tracker = JobTracker()